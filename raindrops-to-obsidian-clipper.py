@@ -14,11 +14,69 @@ Version: 1.0
 import csv
 import os
 import re
-from datetime import datetime
-from urllib.parse import urlparse
+from functools import lru_cache
 from pathlib import Path
 import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+
+# Characters that are invalid in filenames on common operating systems
+_INVALID_FILENAME_CHARS = '<>:"/\\|?*'
+_SANITIZE_ALLOWED = re.compile(r'[\w\s\-_.,()[\]{}#@&+=!~]')
+_SANITIZE_WS = re.compile(r'\s+')
+
+
+class _SanitizeTable(dict):
+    """
+    Translation table for str.translate that deletes unwanted characters.
+    
+    Entries are computed on first lookup, so each distinct code point is
+    only classified once per run.
+    """
+    
+    def __missing__(self, code):
+        char = chr(code)
+        if char in _INVALID_FILENAME_CHARS or not _SANITIZE_ALLOWED.match(char):
+            value = None
+        else:
+            value = code
+        self[code] = value
+        return value
+
+
+_SANITIZE_TABLE = _SanitizeTable()
+
+# Escapes quotes and flattens newlines in YAML descriptions
+_YAML_DESC_TABLE = str.maketrans({'"': '\\"', '\n': ' '})
+
+# Longest filename stem (Windows has a 255 char limit, leave room for .md)
+MAX_FILENAME_LENGTH = 250
+
+# Buffer size used when reading the CSV file
+READ_BUFFER_SIZE = 1 << 20
+
+# Normalized folder tags, keyed by folder name
+_FOLDER_TAG_CACHE = {}
+
+# Maximum number of URLs remembered by extract_domain
+DOMAIN_CACHE_SIZE = 4096
+
+# Number of rows handed to the worker pool at a time, and per worker task
+BATCH_SIZE = 1000
+CHUNK_SIZE = 64
+
+# Default number of writer threads when using a thread pool
+THREAD_WORKERS = 16
+
+# Per-run settings shared by every row, set once per worker by init_worker
+_worker_idx = {}
+_worker_prefix = ''
+
+# Number of created files listed in the summary
+SAMPLE_FILES = 10
 
 
 def sanitize_filename(title):
@@ -35,17 +93,17 @@ def sanitize_filename(title):
         return "Untitled"
     
     # Remove or replace problematic characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', title)
-    filename = re.sub(r'[^\w\s\-_.,()[\]{}#@&+=!~]', '', filename)
-    filename = re.sub(r'\s+', ' ', filename).strip()
+    filename = title.translate(_SANITIZE_TABLE)
+    filename = _SANITIZE_WS.sub(' ', filename).strip()
     
     # Limit length (Windows has 255 char limit, leave room for .md extension)
-    if len(filename) > 250:
-        filename = filename[:250].rstrip()
+    if len(filename) > MAX_FILENAME_LENGTH:
+        filename = filename[:MAX_FILENAME_LENGTH].rstrip()
     
     return filename if filename else "Untitled"
 
 
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
 def extract_domain(url):
     """
     Extract domain from URL for author field.
@@ -56,13 +114,26 @@ def extract_domain(url):
     Returns:
         str: Domain name or empty string if invalid URL
     """
-    try:
-        if not url or url.strip() == '':
-            return ''
-        domain = urlparse(url).netloc
-        return domain.replace('www.', '') if domain else ''
-    except:
+    if not url:
         return ''
+    
+    # Raindrops URLs are always absolute, so the domain is everything
+    # between '://' and the first '/', '?' or '#'
+    start = url.find('://')
+    if start == -1:
+        return ''
+    start += 3
+    
+    end = len(url)
+    for sep in '/?#':
+        pos = url.find(sep, start)
+        if pos != -1 and pos < end:
+            end = pos
+    
+    domain = url[start:end].lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
 
 
 def format_tags(tags_str, folder):
@@ -76,13 +147,23 @@ def format_tags(tags_str, folder):
     Returns:
         list: List of formatted tags
     """
+    # Most entries have no tags and sit in 'Unsorted'
+    if not tags_str and (not folder or folder == 'Unsorted'):
+        return ['clippings']
+    
     tags = ['clippings']  # Always include 'clippings' tag
     
     # Add folder as tag if it's not 'Unsorted'
-    if folder and folder.lower() != 'unsorted':
-        # Convert folder name to lowercase and replace spaces with hyphens
-        folder_tag = folder.lower().replace(' ', '-')
-        tags.append(folder_tag)
+    if folder:
+        folder_tag = _FOLDER_TAG_CACHE.get(folder)
+        if folder_tag is None:
+            # Convert folder name to lowercase and replace spaces with hyphens,
+            # caching '' for 'Unsorted' so it is skipped on later rows too
+            folder_tag = folder.lower()
+            folder_tag = '' if folder_tag == 'unsorted' else folder_tag.replace(' ', '-')
+            _FOLDER_TAG_CACHE[folder] = folder_tag
+        if folder_tag:
+            tags.append(folder_tag)
     
     # Process existing tags
     if tags_str and tags_str.strip():
@@ -92,12 +173,7 @@ def format_tags(tags_str, folder):
         tags.extend(existing_tags)
     
     # Remove duplicates while preserving order
-    unique_tags = []
-    for tag in tags:
-        if tag not in unique_tags:
-            unique_tags.append(tag)
-    
-    return unique_tags
+    return list(dict.fromkeys(tags))
 
 
 def format_date(date_str):
@@ -110,35 +186,63 @@ def format_date(date_str):
     Returns:
         str: Formatted date (YYYY-MM-DD) or empty string
     """
-    try:
-        if not date_str or date_str.strip() == '':
-            return ''
-        # Parse ISO format and return just the date part
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        return dt.strftime('%Y-%m-%d')
-    except:
+    if not date_str:
         return ''
+    
+    # ISO dates start with YYYY-MM-DD, so return that prefix if it looks valid
+    date_str = date_str.strip()
+    if (len(date_str) >= 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[:4].isdigit() and date_str[5:7].isdigit()
+            and date_str[8:10].isdigit()):
+        return date_str[:10]
+    return ''
+
+
+def get_field(row, idx, name, default=''):
+    """
+    Get a column value from a CSV row by header name.
+    
+    Args:
+        row (list): List of values for a CSV row
+        idx (dict): Mapping of column names to their positions in the row
+        name (str): Column name to look up
+        default (str): Value returned when the column is missing
+        
+    Returns:
+        str: Column value with line endings normalized to '\\n', or default
+            if the column is missing
+    """
+    i = idx.get(name)
+    if i is None or i >= len(row):
+        return default
+    value = row[i]
+    # The CSV is read with newline='', so quoted fields keep their original
+    # CRLF or CR line breaks; a lone CR would break the YAML front matter
+    if '\r' in value:
+        value = value.replace('\r\n', '\n').replace('\r', '\n')
+    return value
 
 
-def create_markdown_content(row):
+def create_markdown_content(row, idx):
     """
     Create markdown content from a CSV row.
     
     Args:
-        row (dict): Dictionary containing the CSV row data
+        row (list): List of values for a CSV row
+        idx (dict): Mapping of column names to their positions in the row
         
     Returns:
-        str: Formatted markdown content
+        bytearray: Formatted markdown content, encoded as UTF-8
     """
-    title = row.get('title', '').strip()
-    url = row.get('url', '').strip()
-    excerpt = row.get('excerpt', '').strip()
-    note = row.get('note', '').strip()
-    tags_str = row.get('tags', '').strip()
-    folder = row.get('folder', '').strip()
-    created = row.get('created', '').strip()
-    cover = row.get('cover', '').strip()
-    highlights = row.get('highlights', '').strip()
+    title = get_field(row, idx, 'title').strip()
+    url = get_field(row, idx, 'url').strip()
+    excerpt = get_field(row, idx, 'excerpt').strip()
+    note = get_field(row, idx, 'note').strip()
+    tags_str = get_field(row, idx, 'tags').strip()
+    folder = get_field(row, idx, 'folder').strip()
+    created = get_field(row, idx, 'created').strip()
+    cover = get_field(row, idx, 'cover').strip()
+    highlights = get_field(row, idx, 'highlights').strip()
     
     # Format components
     domain = extract_domain(url)
@@ -146,72 +250,236 @@ def create_markdown_content(row):
     formatted_date = format_date(created)
     formatted_tags = format_tags(tags_str, folder)
     
-    # Build YAML front matter
-    yaml_lines = ['---']
-    
-    if author:
-        yaml_lines.append('author:')
-        yaml_lines.append(f"- '{author}'")
-    
-    if formatted_date:
-        yaml_lines.append(f"created: '{formatted_date}'")
+    # Build YAML front matter blocks
+    author_block = f"author:\n- '{author}'\n" if author else ''
+    date_block = f"created: '{formatted_date}'\n" if formatted_date else ''
     
     if excerpt:
         # Escape quotes and handle multiline descriptions
-        escaped_excerpt = excerpt.replace('"', '\\"').replace('\n', ' ')
-        yaml_lines.append(f'description: {escaped_excerpt}')
-    
-    yaml_lines.append("published: ''")
-    
-    if url:
-        yaml_lines.append(f'source: {url}')
-    
-    yaml_lines.append('tags:')
-    for tag in formatted_tags:
-        yaml_lines.append(f'- {tag}')
+        escaped_excerpt = excerpt.translate(_YAML_DESC_TABLE)
+        desc_block = f'description: {escaped_excerpt}\n'
+    else:
+        desc_block = ''
     
-    yaml_lines.append(f'title: {title}')
-    yaml_lines.append('---')
+    url_block = f'source: {url}\n' if url else ''
+    tags_block = ''.join(f'- {tag}\n' for tag in formatted_tags)
     
-    # Build content
-    content_lines = yaml_lines[:]
+    # Encode the front matter, then append the body sections as bytes so
+    # long excerpts and highlights are never copied into one big string
+    buf = bytearray(
+        f"---\n{author_block}{date_block}{desc_block}published: ''\n"
+        f"{url_block}tags:\n{tags_block}title: {title}\n---".encode('utf-8'))
     
     # Add summary section if we have excerpt or note
     if excerpt or note:
-        content_lines.append('')
-        content_lines.append('## Summary')
-        content_lines.append('')
+        buf += b'\n\n## Summary\n\n'
         if excerpt:
-            content_lines.append(excerpt)
+            buf += excerpt.encode('utf-8')
         if note:
             if excerpt:
-                content_lines.append('')
-            content_lines.append(note)
+                buf += b'\n\n'
+            buf += note.encode('utf-8')
     
     # Add highlights if available
-    if highlights and highlights.strip():
-        content_lines.append('')
-        content_lines.append('## Highlights')
-        content_lines.append('')
-        content_lines.append(highlights)
+    if highlights:
+        buf += b'\n\n## Highlights\n\n'
+        buf += highlights.encode('utf-8')
     
     # Add source link
     if url:
-        content_lines.append('')
-        content_lines.append('## Source')
-        content_lines.append('')
-        content_lines.append(f'[View Original]({url})')
+        buf += f'\n\n## Source\n\n[View Original]({url})'.encode('utf-8')
     
-    return '\n'.join(content_lines)
+    return buf
 
 
-def convert_csv_to_markdown(csv_file, output_dir='output'):
+def write_file(filepath, data):
+    """
+    Write encoded content to a file using a single low-level write.
+    
+    Args:
+        filepath (str): Path of the file to write
+        data (bytes): Encoded content to write
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(filepath, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def unique_filename(stem, ext, used_names):
+    """
+    Make a filename unique among those already used in this run.
+    
+    Args:
+        stem (str): The candidate filename without its extension
+        ext (str): The file extension, including the leading dot
+        used_names (set): Lowercased filenames already used, updated in place
+        
+    Returns:
+        str: The filename, with a numeric suffix added to the stem if it was
+            already used
+    """
+    # The stem is passed separately, as os.path.splitext would not split
+    # names made only of dots such as '..md'
+    filename = stem + ext
+    
+    # Compare case-insensitively, as Windows and macOS file systems do
+    key = filename.lower()
+    if key in used_names:
+        n = 1
+        while True:
+            n += 1
+            # Trim the stem so the suffix stays within the length limit
+            suffix = f"-{n}"
+            candidate = stem[:MAX_FILENAME_LENGTH - len(suffix)].rstrip() + suffix + ext
+            if candidate.lower() not in used_names:
+                break
+        filename = candidate
+        key = filename.lower()
+    
+    used_names.add(key)
+    return filename
+
+
+def iter_tasks(reader, idx):
+    """
+    Build conversion tasks for each CSV row, assigning unique filenames.
+    
+    Args:
+        reader: csv.reader positioned after the header row
+        idx (dict): Mapping of column names to their positions in the row
+        
+    Yields:
+        tuple: (row, filename) for process_row
+    """
+    # Bind functions used in the row loop to locals for faster lookup
+    get = get_field
+    sanitize = sanitize_filename
+    unique = unique_filename
+    
+    used_names = set()
+    for row in reader:
+        # Skip blank lines
+        if not row:
+            continue
+        
+        title = get(row, idx, 'title').strip()
+        if not title:
+            title = "Untitled"
+        
+        # Create filename
+        filename = unique(sanitize(title), '.md', used_names)
+        yield row, filename
+
+
+def init_worker(idx, prefix):
+    """
+    Store the settings shared by every row in the current process.
+    
+    Used as the worker pool initializer, so the header map and output path
+    are sent to each worker once rather than with every row.
+    
+    Args:
+        idx (dict): Mapping of column names to their positions in the row
+        prefix (str): Output directory with a trailing path separator
+    """
+    global _worker_idx, _worker_prefix
+    _worker_idx = idx
+    _worker_prefix = prefix
+
+
+def process_row(task):
+    """
+    Convert a single CSV row into a markdown file.
+    
+    Args:
+        task (tuple): (row, filename) for the row to convert
+        
+    Returns:
+        tuple: (filename, error) where error is None on success, or
+            (title, error message) if the row could not be converted
+    """
+    row, filename = task
+    idx = _worker_idx
+    try:
+        filepath = _worker_prefix + filename
+        
+        # Create markdown content
+        markdown_content = create_markdown_content(row, idx)
+        
+        # Write file
+        write_file(filepath, markdown_content)
+        
+        return filename, None
+    
+    except Exception as e:
+        return get_field(row, idx, 'title', 'Unknown'), str(e)
+
+
+def iter_batches(iterable, size):
+    """
+    Split an iterable into lists of at most size items.
+    
+    Args:
+        iterable: Items to split
+        size (int): Maximum number of items per batch
+        
+    Yields:
+        list: The next batch of items
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_results(executor, tasks):
+    """
+    Run process_row over tasks, yielding results in CSV order.
+    
+    With a pool, the next batch is submitted before the current one is
+    drained, so reading and sanitizing rows overlaps with the workers.
+    
+    Args:
+        executor: Worker pool, or None to convert rows in this process
+        tasks: Iterable of (row, filename) tasks
+        
+    Yields:
+        tuple: (filename, error) as returned by process_row
+    """
+    if executor is None:
+        yield from map(process_row, tasks)
+        return
+    
+    pending = None
+    for batch in iter_batches(tasks, BATCH_SIZE):
+        results = executor.map(process_row, batch, chunksize=CHUNK_SIZE)
+        if pending is not None:
+            yield from pending
+        pending = results
+    if pending is not None:
+        yield from pending
+
+
+def convert_csv_to_markdown(csv_file, output_dir='output', workers=None,
+                            use_threads=False):
     """
     Convert Raindrops CSV to Obsidian Web Clipper markdown files.
     
     Args:
         csv_file (str): Path to the input CSV file
         output_dir (str): Output directory for markdown files
+        workers (int): Number of workers (default: 1, which converts rows in
+            the current process, or THREAD_WORKERS with use_threads)
+        use_threads (bool): Use a thread pool instead of a process pool, which
+            overlaps file writes when output is I/O bound (e.g. network drives)
         
     Returns:
         tuple: (successful_conversions, failed_conversions)
@@ -219,73 +487,103 @@ def convert_csv_to_markdown(csv_file, output_dir='output'):
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
+    if workers is None:
+        workers = THREAD_WORKERS if use_threads else 1
+    
     successful_conversions = 0
     failed_conversions = 0
-    created_files = []
+    sample_files = []  # First few filenames, shown in the summary
+    executor = None
+    aborted = False
     
     try:
-        with open(csv_file, 'r', encoding='utf-8') as file:
-            # Use csv.Sniffer to detect delimiter
-            sample = file.read(1024)
+        with open(csv_file, 'r', encoding='utf-8', newline='',
+                  buffering=READ_BUFFER_SIZE) as file:
+            # Raindrops exports are comma-separated, but allow for
+            # semicolons from spreadsheet re-saves in some locales. Check the
+            # first non-blank line, which is the one read as the header below
+            header_line = ''
+            for line in file:
+                if line.strip():
+                    header_line = line
+                    break
             file.seek(0)
-            sniffer = csv.Sniffer()
-            delimiter = sniffer.sniff(sample).delimiter
+            if header_line.count(';') > header_line.count(','):
+                delimiter = ';'
+            else:
+                delimiter = ','
             
-            reader = csv.DictReader(file, delimiter=delimiter)
+            reader = csv.reader(file, delimiter=delimiter)
+            # Skip blank lines before the header, as csv.DictReader does
+            header = next((row for row in reader if row), [])
+            if not header:
+                print(f"Error reading CSV file: '{csv_file}' is empty or has no header row.")
+                return 0, 1
+            idx = {name: i for i, name in enumerate(header)}
             
-            # Count total rows for progress
-            total_rows = sum(1 for _ in reader)
-            file.seek(0)
-            reader = csv.DictReader(file, delimiter=delimiter)
+            # Join once with an empty name to get the directory prefix, so
+            # per-row paths are plain concatenation but match os.path.join
+            prefix = os.path.join(output_dir, '')
+            
+            # Threads and inline conversion share this process's settings;
+            # worker processes receive them once through the initializer
+            init_worker(idx, prefix)
+            if workers == 1:
+                executor = None
+            elif use_threads:
+                executor = ThreadPoolExecutor(max_workers=workers)
+            else:
+                executor = ProcessPoolExecutor(max_workers=workers,
+                                               initializer=init_worker,
+                                               initargs=(idx, prefix))
             
-            print(f"Processing {total_rows} entries from CSV...")
+            # Rows are processed in a single streaming pass
+            print("Processing entries from CSV...")
             print()
             
-            for row in reader:
-                try:
-                    title = row.get('title', '').strip()
-                    if not title:
-                        title = "Untitled"
-                    
-                    # Create filename
-                    filename = sanitize_filename(title) + '.md'
-                    filepath = os.path.join(output_dir, filename)
-                    
-                    # Create markdown content
-                    markdown_content = create_markdown_content(row)
-                    
-                    # Write file
-                    with open(filepath, 'w', encoding='utf-8') as md_file:
-                        md_file.write(markdown_content)
-                    
+            tasks = iter_tasks(reader, idx)
+            
+            for filename, error in iter_results(executor, tasks):
+                if error is None:
                     successful_conversions += 1
-                    created_files.append(filename)
-                    
-                except Exception as e:
-                    print(f"Error processing row with title '{row.get('title', 'Unknown')}': {e}")
+                    if len(sample_files) < SAMPLE_FILES:
+                        sample_files.append(filename)
+                else:
+                    print(f"Error processing row with title '{filename}': {error}")
                     failed_conversions += 1
-                    continue
     
     except FileNotFoundError:
         print(f"Error: CSV file '{csv_file}' not found.")
         return 0, 1
+    except BrokenProcessPool as e:
+        # A worker died (e.g. killed or out of memory); the run stops, but
+        # files already written are kept and reported
+        print(f"Error: worker process stopped unexpectedly: {e}")
+        failed_conversions += 1
+        aborted = True
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return 0, 1
+    finally:
+        if executor:
+            executor.shutdown()
     
     # Print summary
     print()
-    print("Conversion complete!")
+    if aborted:
+        print("Conversion aborted! Remaining rows in the CSV were not processed.")
+    else:
+        print("Conversion complete!")
     print(f"Successfully converted: {successful_conversions} files")
     print(f"Failed conversions: {failed_conversions}")
     
-    if created_files:
+    if sample_files:
         print("Files created or modified:")
-        # Show first 10 files as examples
-        for filename in created_files[:10]:
+        # Show the first few files as examples
+        for filename in sample_files:
             print(f"- {output_dir}/{filename}")
-        if len(created_files) > 10:
-            print(f"... and {len(created_files) - 10} more files")
+        if successful_conversions > len(sample_files):
+            print(f"... and {successful_conversions - len(sample_files)} more files")
     
     return successful_conversions, failed_conversions
 
@@ -306,17 +604,27 @@ Examples:
     parser.add_argument('csv_file', help='Path to the Raindrops CSV backup file')
     parser.add_argument('output_dir', nargs='?', default='output',
                        help='Output directory for markdown files (default: output)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                       help='Number of worker processes (default: 1, '
+                            f'or {THREAD_WORKERS} threads with --threads)')
+    parser.add_argument('--threads', action='store_true',
+                       help='Use threads instead of processes, for slow or '
+                            'network file systems')
     parser.add_argument('--version', action='version', version='%(prog)s 1.0')
     
     args = parser.parse_args()
     
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    
     # Validate input file
     if not os.path.exists(args.csv_file):
         print(f"Error: Input file '{args.csv_file}' does not exist.")
         sys.exit(1)
     
     # Run conversion
-    successful, failed = convert_csv_to_markdown(args.csv_file, args.output_dir)
+    successful, failed = convert_csv_to_markdown(args.csv_file, args.output_dir,
+                                                 args.workers, args.threads)
     
     # Exit with appropriate code
     if failed > 0 and successful == 0: